@@ -1,54 +1,147 @@
-from dash import Dash, dash_table, html, dcc, Input, Output, State, callback_context
+from dash import Dash, dash_table, html, dcc, Input, Output, State, callback_context, no_update
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-from page import read_fault_data, read_warning_data, read_dim_data, process_data_for_fault
+from page import (read_fault_data, read_dim_data, process_data_for_fault, refresh_warning_cache,
+                  build_facet_index, query_facet_counts, get_data_mtimes)
 import pandas as pd
+import os
+import threading
+import time
 # from datetime import datetime, timedelta
 
 # 创建 Dash 应用
 app = Dash(__name__)
 
-# 获取并处理数据
-fault_data = read_fault_data().drop_duplicates().reset_index(drop=True)
-all_warning_data = read_warning_data().sort_values(
-    by=['device_name','start_time'], 
-    ascending=False
-).reset_index(drop=True)
-dim_data = read_dim_data()
-processed_data, warnings = process_data_for_fault(fault_data, all_warning_data, dim_data)
-processed_data = processed_data[[
-    'site_name', 'phase_name', 'device_name',
-    'fault_name', 'fault_start_time', 'fault_end_time',
-    'earliest_warning_time', 'date_dif', 'warning_count', 
-    'warning_days', 'monthly_counts'
-]]
+# 预警信息表格每页行数（服务端分页）
+WARNING_PAGE_SIZE = 10
 
-processed_data['earliest_warning_time'] = processed_data['earliest_warning_time'].fillna(pd.NaT)
-processed_data['date_dif'] = processed_data['date_dif'].fillna(0)
-processed_data['warning_count'] = processed_data['warning_count'].fillna(0)
-processed_data['warning_days'] = processed_data['warning_days'].fillna(0)
-processed_data['monthly_counts'] = processed_data['monthly_counts'].fillna({})
-# print(processed_data[processed_data['earliest_warning_time'].isna()])
-# 获取所有月份的并集
-all_months = set()
-for _, row in processed_data.iterrows():
-    all_months.update(row['monthly_counts'].keys())
-all_months = sorted(list(all_months))
+# 数据目录轮询间隔（秒）
+REFRESH_INTERVAL_SECONDS = 60
 
-# 获取筛选选项（添加全选选项）
-def get_options_with_select_all(values, field_name):
-    unique_values = sorted(values.unique())
+# 是否以 debug 模式运行（debug 模式会启用 Werkzeug 重载器）
+DEBUG = True
+
+# 单个故障对应预警数据中单日预警次数的最大值
+def get_daily_max_warning_count(warning_df):
+    if warning_df.empty:
+        return 0
+    return int(warning_df.groupby(warning_df['start_time'].dt.date).size().max())
+
+# 获取并处理数据，生成一个版本化的数据快照
+# 回调中只读取一次当前快照，刷新时整体替换，保证每次请求看到的数据一致
+# 传入上一个快照时只重新计算受影响的部分：
+# 故障表或维度表变化时全部重新计算；只有预警文件变化时，只重新计算涉及变化设备的故障
+def load_snapshot(version, previous=None):
+    mtimes = get_data_mtimes()
+    # 复制上一个快照的文件缓存，构建失败时上一个快照保持不变
+    warning_files = dict(previous['warning_files']) if previous else {}
+    changed_devices = refresh_warning_cache(warning_files)
+    dfs = [alarm_data for _, alarm_data in warning_files.values()]
+    all_warning_data = (pd.concat(dfs) if dfs else pd.DataFrame()).sort_values(
+        by=['device_name','start_time'], 
+        ascending=False
+    ).reset_index(drop=True)
+    
+    if previous is None or mtimes['base'] != previous['mtimes']['base']:
+        fault_data = read_fault_data().drop_duplicates().reset_index(drop=True)
+        dim_data = read_dim_data()
+        fault_results, warnings = process_data_for_fault(fault_data, all_warning_data, dim_data)
+        daily_max_counts = [get_daily_max_warning_count(df) for df in warnings]
+        facet_index = None
+    else:
+        fault_data = previous['fault_data']
+        dim_data = previous['dim_data']
+        fault_results = previous['fault_results']
+        warnings = list(previous['warnings'])
+        daily_max_counts = list(previous['daily_max_counts'])
+        # 故障名称、设备、风场都来自故障表，故障表未变化时筛选项索引可直接沿用
+        facet_index = previous['facet_index']
+        
+        affected = fault_data.index[fault_data['device_id'].isin(changed_devices)]
+        if len(affected):
+            new_results, new_warnings = process_data_for_fault(
+                fault_data.loc[affected].copy(),
+                all_warning_data[all_warning_data['device_id'].isin(changed_devices)].copy(),
+                dim_data
+            )
+            new_results.index = affected
+            fault_results = pd.concat([fault_results.drop(affected), new_results]).sort_index()
+            for i, warning_df in zip(affected, new_warnings):
+                warnings[i] = warning_df
+                daily_max_counts[i] = get_daily_max_warning_count(warning_df)
+    
+    processed_data = fault_results[[
+        'site_name', 'phase_name', 'device_name',
+        'fault_name', 'fault_start_time', 'fault_end_time',
+        'earliest_warning_time', 'date_dif', 'warning_count', 
+        'warning_days', 'monthly_counts'
+    ]]
+    
+    processed_data['earliest_warning_time'] = processed_data['earliest_warning_time'].fillna(pd.NaT)
+    processed_data['date_dif'] = processed_data['date_dif'].fillna(0)
+    processed_data['warning_count'] = processed_data['warning_count'].fillna(0)
+    processed_data['warning_days'] = processed_data['warning_days'].fillna(0)
+    processed_data['monthly_counts'] = processed_data['monthly_counts'].fillna({})
+    # print(processed_data[processed_data['earliest_warning_time'].isna()])
+    # 获取所有月份的并集
+    all_months = set()
+    for _, row in processed_data.iterrows():
+        all_months.update(row['monthly_counts'].keys())
+    all_months = sorted(list(all_months))
+    
+    return {
+        'version': version,
+        'loaded_at': pd.Timestamp.now(),
+        'mtimes': mtimes,
+        'warning_files': warning_files,
+        'fault_data': fault_data,
+        'dim_data': dim_data,
+        'fault_results': fault_results,
+        'processed_data': processed_data,
+        'warnings': warnings,
+        'all_months': all_months,
+        'daily_max_counts': daily_max_counts,
+        # 所有记录中单日预警次数的全局最大值，用于统一日历热力图的颜色范围
+        'global_max_warning_count': max(daily_max_counts, default=0),
+        # 构建筛选项索引，下拉框之间的联动只查询索引，不再扫描整张表
+        'facet_index': facet_index if facet_index is not None else build_facet_index(processed_data),
+    }
+
+snapshot = load_snapshot(1)
+
+# 后台轮询数据目录，文件有变化时重新构建快照并整体替换
+def refresh_worker():
+    global snapshot
+    while True:
+        time.sleep(REFRESH_INTERVAL_SECONDS)
+        try:
+            if get_data_mtimes() == snapshot['mtimes']:
+                continue
+            snapshot = load_snapshot(snapshot['version'] + 1, snapshot)
+            app.logger.info('数据已刷新: 版本 %s, %s', snapshot['version'], snapshot['loaded_at'])
+        except Exception:
+            # 文件可能正在写入，保留当前快照，下次轮询重试
+            app.logger.exception('数据刷新失败')
+
+refresh_thread = None
+
+def start_refresh_worker():
+    global refresh_thread
+    if refresh_thread is None:
+        refresh_thread = threading.Thread(target=refresh_worker, name='data-refresh', daemon=True)
+        refresh_thread.start()
+    return refresh_thread
+
+# 获取筛选选项（添加全选选项），选项后显示对应的故障条数
+def get_options_with_select_all(counts, field_name, selected=None):
+    values = set(counts)
+    # 已选中的值即使不在当前范围内也保留，避免被下拉框清除
+    values.update(v for v in (selected or []) if v != 'ALL')
     return [{'label': f'全选{field_name}', 'value': 'ALL'}] + [
-        {'label': str(x), 'value': str(x)} for x in unique_values
+        {'label': f'{x} ({counts.get(x, 0)})', 'value': x} for x in sorted(values)
     ]
 
-phase_options = get_options_with_select_all(processed_data['phase_name'], '风场')
-device_options = get_options_with_select_all(processed_data['device_name'], '设备')
-fault_options = get_options_with_select_all(processed_data['fault_name'], '故障')
-date_min = processed_data['fault_start_time'].min()
-date_max = processed_data['fault_start_time'].max()
-
 # 修改 STYLES 定义
 STYLES = {
     'dropdown': {
@@ -71,183 +164,221 @@ STYLES = {
     }
 }
 
-# 设置布局
-app.layout = html.Div([
-    # 标题
-    html.H1("故障与预警分析系统", style={'textAlign': 'center'}),
-    
-    # 筛选器区域
-    html.Div([
-        # 第一行筛选器（相别、设备名称、故障名称、故障开始时间范围）
+# 滑块的取值范围和刻度
+def get_range_slider_bounds(values):
+    value_min, value_max = int(values.min()), int(values.max())
+    marks = {i: str(i) for i in range(
+        value_min,
+        value_max + 1,
+        max(1, int((value_max - value_min) / 5))
+    )}
+    return value_min, value_max, marks
+
+# 数据版本提示文字
+def format_data_version(snap, updated=False):
+    text = f"数据版本 {snap['version']}，更新时间 {snap['loaded_at']:%Y-%m-%d %H:%M:%S}"
+    if updated:
+        text += '（数据已更新，筛选范围已同步，点击“应用筛选”刷新表格）'
+    return text
+
+# 设置布局（每次打开页面时按当前快照生成；之后的数据刷新由 update_data_version 同步到筛选项）
+def serve_layout():
+    snap = snapshot
+    processed_data = snap['processed_data']
+    phase_counts, device_counts, fault_counts = query_facet_counts(snap['facet_index'])
+    phase_options = get_options_with_select_all(phase_counts, '风场')
+    device_options = get_options_with_select_all(device_counts, '设备')
+    fault_options = get_options_with_select_all(fault_counts, '故障')
+    date_min = processed_data['fault_start_time'].min()
+    date_max = processed_data['fault_start_time'].max()
+    date_dif_min, date_dif_max, date_dif_marks = get_range_slider_bounds(processed_data['date_dif'])
+    warning_days_min, warning_days_max, warning_days_marks = get_range_slider_bounds(processed_data['warning_days'])
+    return html.Div([
+        # 标题
+        html.H1("故障与预警分析系统", style={'textAlign': 'center'}),
+        
+        # 数据版本提示，后台刷新后同步筛选范围，并提示点击“应用筛选”刷新表格
+        html.Div(
+            format_data_version(snap),
+            id='data-version',
+            style={'textAlign': 'center', 'color': '#666', 'marginBottom': '10px'}
+        ),
+        # 当前页面筛选项所对应的数据版本
+        dcc.Store(id='page-version', data=snap['version']),
+        dcc.Store(id='facet-selection'),
+        dcc.Interval(id='refresh-interval', interval=REFRESH_INTERVAL_SECONDS * 1000),
+    
+        # 筛选器区域
         html.Div([
+            # 第一行筛选器（相别、设备名称、故障名称、故障开始时间范围）
             html.Div([
-                html.Label('风场:', style=STYLES['label']),
-                dcc.Dropdown(
-                    id='phase-filter',
-                    options=phase_options,
-                    multi=True,
-                    maxHeight=200,
-                    style=STYLES['dropdown'],
-                    placeholder='请选择风场...',
-                    clearable=True,
-                )
-            ], style={'width': '20%', 'display': 'inline-block', 'marginRight': '20px'}),
+                html.Div([
+                    html.Label('风场:', style=STYLES['label']),
+                    dcc.Dropdown(
+                        id='phase-filter',
+                        options=phase_options,
+                        multi=True,
+                        maxHeight=200,
+                        style=STYLES['dropdown'],
+                        placeholder='请选择风场...',
+                        clearable=True,
+                    )
+                ], style={'width': '20%', 'display': 'inline-block', 'marginRight': '20px'}),
             
-            html.Div([
-                html.Label('设备名称:', style=STYLES['label']),
-                dcc.Dropdown(
-                    id='device-filter',
-                    options=device_options,
-                    multi=True,
-                    maxHeight=200,
-                    style=STYLES['dropdown'],
-                    placeholder='请选择设备...',
-                    clearable=True,
-                )
-            ], style={'width': '20%', 'display': 'inline-block', 'marginRight': '20px'}),
+                html.Div([
+                    html.Label('设备名称:', style=STYLES['label']),
+                    dcc.Dropdown(
+                        id='device-filter',
+                        options=device_options,
+                        multi=True,
+                        maxHeight=200,
+                        style=STYLES['dropdown'],
+                        placeholder='请选择设备...',
+                        clearable=True,
+                    )
+                ], style={'width': '20%', 'display': 'inline-block', 'marginRight': '20px'}),
             
-            html.Div([
-                html.Label('故障名称:', style=STYLES['label']),
-                dcc.Dropdown(
-                    id='fault-filter',
-                    options=fault_options,
-                    multi=True,
-                    maxHeight=200,
-                    style=STYLES['dropdown'],
-                    placeholder='请选择故障...',
-                    clearable=True,
-                )
-            ], style={'width': '20%', 'display': 'inline-block', 'marginRight': '20px'}),
+                html.Div([
+                    html.Label('故障名称:', style=STYLES['label']),
+                    dcc.Dropdown(
+                        id='fault-filter',
+                        options=fault_options,
+                        multi=True,
+                        maxHeight=200,
+                        style=STYLES['dropdown'],
+                        placeholder='请选择故障...',
+                        clearable=True,
+                    )
+                ], style={'width': '20%', 'display': 'inline-block', 'marginRight': '20px'}),
             
-            html.Div([
-                html.Label('故障开始时间范围:', style=STYLES['label']),
-                dcc.DatePickerRange(
-                    id='date-range-filter',
-                    min_date_allowed=date_min.date(),
-                    max_date_allowed=date_max.date(),
-                    start_date=date_min.date(),
-                    end_date=date_max.date(),
-                    display_format='YYYY-MM-DD',
-                    first_day_of_week=1,
-                    calendar_orientation='horizontal',
-                    month_format='YYYY年 MM月',
-                    clearable=True,
-                    style=STYLES['date_input']
-                )
-            ], style={'width': '20%', 'display': 'inline-block'}),
-        ], style={'marginBottom': '10px', 'display': 'flex', 'alignItems': 'flex-start'}),
+                html.Div([
+                    html.Label('故障开始时间范围:', style=STYLES['label']),
+                    dcc.DatePickerRange(
+                        id='date-range-filter',
+                        min_date_allowed=date_min.date(),
+                        max_date_allowed=date_max.date(),
+                        start_date=date_min.date(),
+                        end_date=date_max.date(),
+                        display_format='YYYY-MM-DD',
+                        first_day_of_week=1,
+                        calendar_orientation='horizontal',
+                        month_format='YYYY年 MM月',
+                        clearable=True,
+                        style=STYLES['date_input']
+                    )
+                ], style={'width': '20%', 'display': 'inline-block'}),
+            ], style={'marginBottom': '10px', 'display': 'flex', 'alignItems': 'flex-start'}),
         
-        # 第二行筛选器（预警提前天数和预警天数）
-        html.Div([
+            # 第二行筛选器（预警提前天数和预警天数）
             html.Div([
-                html.Label('预警提前天数:', style=STYLES['label']),
-                dcc.RangeSlider(
-                    id='date-diff-filter',
-                    min=int(processed_data['date_dif'].min()),
-                    max=int(processed_data['date_dif'].max()),
-                    step=1,
-                    marks={i: str(i) for i in range(
-                        int(processed_data['date_dif'].min()),
-                        int(processed_data['date_dif'].max()) + 1,
-                        max(1, int((processed_data['date_dif'].max() - processed_data['date_dif'].min()) / 5))
-                    )},
-                    value=[int(processed_data['date_dif'].min()), int(processed_data['date_dif'].max())],
-                    allowCross=False,
-                    tooltip={'placement': 'bottom', 'always_visible': True}
-                )
-            ], style={'width': '35%', 'display': 'inline-block', 'marginRight': '20px'}),
+                html.Div([
+                    html.Label('预警提前天数:', style=STYLES['label']),
+                    dcc.RangeSlider(
+                        id='date-diff-filter',
+                        min=date_dif_min,
+                        max=date_dif_max,
+                        step=1,
+                        marks=date_dif_marks,
+                        value=[date_dif_min, date_dif_max],
+                        allowCross=False,
+                        tooltip={'placement': 'bottom', 'always_visible': True}
+                    )
+                ], style={'width': '35%', 'display': 'inline-block', 'marginRight': '20px'}),
             
-            html.Div([
-                html.Label('预警天数:', style=STYLES['label']),
-                dcc.RangeSlider(
-                    id='warning-count-filter',
-                    min=int(processed_data['warning_days'].min()),
-                    max=int(processed_data['warning_days'].max()),
-                    step=1,
-                    marks={i: str(i) for i in range(
-                        int(processed_data['warning_days'].min()),
-                        int(processed_data['warning_days'].max()) + 1,
-                        max(1, int((processed_data['warning_days'].max() - processed_data['warning_days'].min()) / 5))
-                    )},
-                    value=[int(processed_data['warning_days'].min()), int(processed_data['warning_days'].max())],
-                    allowCross=False,
-                    tooltip={'placement': 'bottom', 'always_visible': True}
-                )
-            ], style={'width': '35%', 'display': 'inline-block', 'marginRight': '20px'}),
+                html.Div([
+                    html.Label('预警天数:', style=STYLES['label']),
+                    dcc.RangeSlider(
+                        id='warning-count-filter',
+                        min=warning_days_min,
+                        max=warning_days_max,
+                        step=1,
+                        marks=warning_days_marks,
+                        value=[warning_days_min, warning_days_max],
+                        allowCross=False,
+                        tooltip={'placement': 'bottom', 'always_visible': True}
+                    )
+                ], style={'width': '35%', 'display': 'inline-block', 'marginRight': '20px'}),
             
-            # 筛选按钮
-            html.Div([
-                html.Button('应用筛选', id='apply-filters', n_clicks=0, style={'marginRight': '10px'}),
-                html.Button('重置筛选', id='reset-filters', n_clicks=0, style={'marginLeft': '10px'}),
-            ], style={'width': '20%', 'display': 'inline-block', 'verticalAlign': 'bottom'}),
-        ], style={'marginBottom': '20px', 'display': 'flex', 'alignItems': 'center'}),
-    ], style={'padding': '20px', 'backgroundColor': '#f8f9fa', 'marginBottom': '20px'}),
-    
-    # 主数据表格
-    dash_table.DataTable(
-        id='fault-table',
-        data=processed_data.drop('monthly_counts', axis=1).to_dict('records'),
-        columns=[{"name": i, "id": i} for i in processed_data.columns if i != 'monthly_counts'],
-        style_table={
-            'overflowX': 'auto',
-            'width': '100%'
-        },
-        style_cell={
-            'textAlign': 'left',
-            'minWidth': '100px',
-            'maxWidth': '180px',
-            'overflow': 'hidden',
-            'textOverflow': 'ellipsis',
-        },
-        style_header={
-            'backgroundColor': 'rgb(230, 230, 230)',
-            'fontWeight': 'bold',
-            'cursor': 'pointer'
-        },
-        page_size=15,
-        row_selectable='single',
-        selected_rows=[0],
-        sort_action='native',
-        sort_mode='single',
-    ),
-    
-    # 下方展示区域（水平排列）
-    html.Div([
-        # 左侧柱状图
+                # 筛选按钮
+                html.Div([
+                    html.Button('应用筛选', id='apply-filters', n_clicks=0, style={'marginRight': '10px'}),
+                    html.Button('重置筛选', id='reset-filters', n_clicks=0, style={'marginLeft': '10px'}),
+                ], style={'width': '20%', 'display': 'inline-block', 'verticalAlign': 'bottom'}),
+            ], style={'marginBottom': '20px', 'display': 'flex', 'alignItems': 'center'}),
+        ], style={'padding': '20px', 'backgroundColor': '#f8f9fa', 'marginBottom': '20px'}),
+    
+        # 主数据表格
+        dash_table.DataTable(
+            id='fault-table',
+            data=processed_data.drop('monthly_counts', axis=1).to_dict('records'),
+            columns=[{"name": i, "id": i} for i in processed_data.columns if i != 'monthly_counts'],
+            style_table={
+                'overflowX': 'auto',
+                'width': '100%'
+            },
+            style_cell={
+                'textAlign': 'left',
+                'minWidth': '100px',
+                'maxWidth': '180px',
+                'overflow': 'hidden',
+                'textOverflow': 'ellipsis',
+            },
+            style_header={
+                'backgroundColor': 'rgb(230, 230, 230)',
+                'fontWeight': 'bold',
+                'cursor': 'pointer'
+            },
+            page_size=15,
+            row_selectable='single',
+            selected_rows=[0],
+            sort_action='native',
+            sort_mode='single',
+        ),
+    
+        # 下方展示区域（水平排列）
         html.Div([
-            dcc.Graph(id='monthly-chart')
-        ], style={'width': '50%', 'display': 'inline-block', 'verticalAlign': 'top'}),
+            # 左侧柱状图
+            html.Div([
+                dcc.Graph(id='monthly-chart')
+            ], style={'width': '50%', 'display': 'inline-block', 'verticalAlign': 'top'}),
         
-        # 右侧预警信息表格
-        html.Div([
-            html.H3("预警信息", style={'marginTop': '0px'}),
-            dash_table.DataTable(
-                id='warning-table',
-                columns=[
-                    {"name": "预警开始时间", "id": "start_time"},
-                    {"name": "预警结束时间", "id": "end_time"},
-                    {"name": "预警信息", "id": "alarm_info"}
-                ],
-                style_table={
-                    'overflowY': 'auto',
-                    'maxHeight': '500px'
-                },
-                style_cell={
-                    'textAlign': 'left',
-                    'minWidth': '100px',
-                    'maxWidth': '300px',
-                    'overflow': 'hidden',
-                    'textOverflow': 'ellipsis',
-                },
-                style_header={
-                    'backgroundColor': 'rgb(230, 230, 230)',
-                    'fontWeight': 'bold'
-                },
-                page_size=10,
-            )
-        ], style={'width': '50%', 'display': 'inline-block', 'verticalAlign': 'top'})
-    ], style={'width': '100%', 'display': 'flex'})
-])
+            # 右侧预警信息表格
+            html.Div([
+                html.H3("预警信息", style={'marginTop': '0px'}),
+                html.Div(id='warning-total', style={'marginBottom': '5px'}),
+                dcc.Store(id='selected-fault'),
+                dash_table.DataTable(
+                    id='warning-table',
+                    columns=[
+                        {"name": "预警开始时间", "id": "start_time"},
+                        {"name": "预警结束时间", "id": "end_time"},
+                        {"name": "预警信息", "id": "alarm_info"}
+                    ],
+                    style_table={
+                        'overflowY': 'auto',
+                        'maxHeight': '500px'
+                    },
+                    style_cell={
+                        'textAlign': 'left',
+                        'minWidth': '100px',
+                        'maxWidth': '300px',
+                        'overflow': 'hidden',
+                        'textOverflow': 'ellipsis',
+                    },
+                    style_header={
+                        'backgroundColor': 'rgb(230, 230, 230)',
+                        'fontWeight': 'bold'
+                    },
+                    page_current=0,
+                    page_size=WARNING_PAGE_SIZE,
+                    page_count=1,
+                    page_action='custom',
+                )
+            ], style={'width': '50%', 'display': 'inline-block', 'verticalAlign': 'top'})
+        ], style={'width': '100%', 'display': 'flex'})
+    ])
+
+app.layout = serve_layout
 
 # 修改 app.index_string 中的 CSS 样式
 app.index_string = '''
@@ -314,83 +445,159 @@ app.index_string = '''
 </html>
 '''
 
-# 添加全选回调函数
-@app.callback(
+# 全选逻辑放在客户端执行，不再为下拉框联动发起服务端请求
+# 处理后的已选值写入 facet-selection，下拉框联动只由它触发，全选展开不会再触发一次请求
+app.clientside_callback(
+    """
+    function(phaseSelected, deviceSelected, faultSelected,
+             phaseOptions, deviceOptions, faultOptions) {
+        const noUpdate = window.dash_clientside.no_update;
+        const ctx = window.dash_clientside.callback_context;
+        if (!ctx.triggered || !ctx.triggered.length) {
+            return [noUpdate, noUpdate, noUpdate, noUpdate];
+        }
+        const triggerId = ctx.triggered[0].prop_id.split('.')[0];
+
+        function handleSelection(selected, allOptions) {
+            if (!selected || !selected.length) {
+                return [];
+            }
+            const allValues = allOptions.map(opt => opt.value);
+            if (selected.includes('ALL')) {
+                return selected.length === 1 ?
+                    allValues : allValues.filter(v => v !== 'ALL');
+            }
+            return selected.length < allOptions.length - 1 ? selected : allValues;
+        }
+
+        const selections = {
+            'phase-filter': [phaseSelected, phaseOptions],
+            'device-filter': [deviceSelected, deviceOptions],
+            'fault-filter': [faultSelected, faultOptions]
+        };
+        if (!(triggerId in selections)) {
+            return [noUpdate, noUpdate, noUpdate, noUpdate];
+        }
+        const newSelected = handleSelection(...selections[triggerId]);
+        const facetSelection = {trigger: triggerId};
+        Object.keys(selections).forEach(key => {
+            facetSelection[key] = key === triggerId ? newSelected : selections[key][0];
+        });
+        return Object.keys(selections).map(key =>
+            key === triggerId ? newSelected : noUpdate
+        ).concat([facetSelection]);
+    }
+    """,
     [Output('phase-filter', 'value'),
      Output('device-filter', 'value'),
-     Output('fault-filter', 'value')],
+     Output('fault-filter', 'value'),
+     Output('facet-selection', 'data')],
     [Input('phase-filter', 'value'),
      Input('device-filter', 'value'),
-     Input('fault-filter', 'value')]
+     Input('fault-filter', 'value')],
+    [State('phase-filter', 'options'),
+     State('device-filter', 'options'),
+     State('fault-filter', 'options')]
 )
-def update_multi_select(phase_selected, device_selected, fault_selected):
-    ctx = callback_context
-    if not ctx.triggered:
-        return [], [], []
-    
-    trigger_id = ctx.triggered[0]['prop_id'].split('.')[0]
-    
-    def handle_selection(selected, all_options):
-        if not selected:
-            return []
-        if 'ALL' in selected:
-            return [opt['value'] for opt in all_options] if len(selected) == 1 else \
-                   [opt['value'] for opt in all_options if opt['value'] != 'ALL']
-        return selected if len(selected) < len(all_options) - 1 else \
-               [opt['value'] for opt in all_options]
-    
-    selections = {
-        'phase-filter': (phase_selected, phase_options),
-        'device-filter': (device_selected, device_options),
-        'fault-filter': (fault_selected, fault_options)
-    }
-    
-    result = [selections[trigger_id][0] if trigger_id == key else (val[0] or [])
-              for key, val in selections.items()]
-    
-    if trigger_id in selections:
-        result[list(selections.keys()).index(trigger_id)] = \
-            handle_selection(*selections[trigger_id])
-    
-    return result
 
-# 修改筛选回调函数
+# 定时检查数据版本，版本未变化时只比较版本号，不传输数据
+# 版本变化时同步滑块和日期范围，并更新 page-version 触发下拉框选项刷新；
+# 用户保持全范围选择时扩展到新范围，否则保留用户的选择
 @app.callback(
-    [Output('fault-table', 'data'),
-     Output('fault-table', 'selected_rows')],
-    [Input('apply-filters', 'n_clicks'),
-     Input('reset-filters', 'n_clicks'),
-     Input('phase-filter', 'value'),
-     Input('device-filter', 'value'),
-     Input('fault-filter', 'value'),
-     Input('date-diff-filter', 'value'),
-     Input('warning-count-filter', 'value'),
-     Input('date-range-filter', 'start_date'),
-     Input('date-range-filter', 'end_date')],
-    [State('fault-table', 'selected_rows'),
-     State('fault-table', 'data')]
+    [Output('data-version', 'children'),
+     Output('page-version', 'data'),
+     Output('date-diff-filter', 'min'),
+     Output('date-diff-filter', 'max'),
+     Output('date-diff-filter', 'marks'),
+     Output('date-diff-filter', 'value'),
+     Output('warning-count-filter', 'min'),
+     Output('warning-count-filter', 'max'),
+     Output('warning-count-filter', 'marks'),
+     Output('warning-count-filter', 'value'),
+     Output('date-range-filter', 'min_date_allowed'),
+     Output('date-range-filter', 'max_date_allowed'),
+     Output('date-range-filter', 'start_date'),
+     Output('date-range-filter', 'end_date')],
+    [Input('refresh-interval', 'n_intervals')],
+    [State('page-version', 'data'),
+     State('date-diff-filter', 'min'),
+     State('date-diff-filter', 'max'),
+     State('date-diff-filter', 'value'),
+     State('warning-count-filter', 'min'),
+     State('warning-count-filter', 'max'),
+     State('warning-count-filter', 'value'),
+     State('date-range-filter', 'min_date_allowed'),
+     State('date-range-filter', 'max_date_allowed'),
+     State('date-range-filter', 'start_date'),
+     State('date-range-filter', 'end_date')],
+    prevent_initial_call=True
 )
-def update_table(apply_clicks, reset_clicks, phases, devices, faults, 
-                date_diff_range, warning_days_range, start_date, end_date,
-                current_selected_rows, current_data):
-    ctx = callback_context
-    if not ctx.triggered:
-        return processed_data.drop('monthly_counts', axis=1).to_dict('records'), [0]
-    
-    button_id = ctx.triggered[0]['prop_id'].split('.')[0]
-    
-    # 如果是重置按钮，返回原始数据
-    if button_id == 'reset-filters':
-        return processed_data.drop('monthly_counts', axis=1).to_dict('records'), [0]
-    
-    # 获取当前选中行的关键信息（如果有）
-    current_selected_row = None
-    if current_selected_rows and current_data:
-        current_selected_row = current_data[current_selected_rows[0]]
-    
-    filtered_data = processed_data.copy()
+def update_data_version(n_intervals, page_version,
+                        date_dif_old_min, date_dif_old_max, date_dif_value,
+                        warning_days_old_min, warning_days_old_max, warning_days_value,
+                        old_min_date, old_max_date, start_date, end_date):
+    snap = snapshot
+    if snap['version'] == page_version:
+        return (no_update,) * 14
+    
+    processed_data = snap['processed_data']
+    
+    def sync_slider(values, old_min, old_max, value):
+        value_min, value_max, marks = get_range_slider_bounds(values)
+        if value == [old_min, old_max]:
+            value = [value_min, value_max]
+        return value_min, value_max, marks, value
+    
+    date_min = str(processed_data['fault_start_time'].min().date())
+    date_max = str(processed_data['fault_start_time'].max().date())
+    
+    return (
+        format_data_version(snap, updated=True),
+        snap['version'],
+    ) + sync_slider(processed_data['date_dif'], date_dif_old_min, date_dif_old_max, date_dif_value) + \
+        sync_slider(processed_data['warning_days'], warning_days_old_min, warning_days_old_max, warning_days_value) + (
+        date_min,
+        date_max,
+        date_min if start_date == old_min_date else no_update,
+        date_max if end_date == old_max_date else no_update,
+    )
+
+# 下拉框相互联动：根据其余筛选项的已选值缩小可选范围
+# 初始选项已由布局生成，不在页面加载时重复发送；触发变化的下拉框自身选项不变，不返回
+@app.callback(
+    [Output('phase-filter', 'options'),
+     Output('device-filter', 'options'),
+     Output('fault-filter', 'options')],
+    [Input('facet-selection', 'data'),
+     Input('page-version', 'data')],
+    prevent_initial_call=True
+)
+def update_filter_options(facet_selection, page_version):
+    facet_selection = facet_selection or {}
+    # 数据版本变化时三个下拉框的选项都需要刷新
+    if callback_context.triggered[0]['prop_id'].startswith('page-version'):
+        facet_selection = dict(facet_selection, trigger=None)
+    phases = facet_selection.get('phase-filter')
+    devices = facet_selection.get('device-filter')
+    faults = facet_selection.get('fault-filter')
+    phase_counts, device_counts, fault_counts = query_facet_counts(
+        snapshot['facet_index'], phases, devices, faults
+    )
+    trigger_id = facet_selection.get('trigger')
+    return (
+        no_update if trigger_id == 'phase-filter' else
+        get_options_with_select_all(phase_counts, '风场', phases),
+        no_update if trigger_id == 'device-filter' else
+        get_options_with_select_all(device_counts, '设备', devices),
+        no_update if trigger_id == 'fault-filter' else
+        get_options_with_select_all(fault_counts, '故障', faults),
+    )
+
+# 根据筛选条件过滤故障数据
+def filter_processed_data(processed_data, phases, devices, faults, date_diff_range,
+                          warning_days_range, start_date, end_date):
+    filtered_data = processed_data
     
-    # 处理筛选条件
     if phases and 'ALL' not in phases:
         filtered_data = filtered_data[filtered_data['phase_name'].isin(phases)]
     if devices and 'ALL' not in devices:
@@ -413,57 +620,24 @@ def update_table(apply_clicks, reset_clicks, phases, devices, faults,
             (filtered_data['fault_start_time'].dt.date <= pd.to_datetime(end_date).date())
         ]
     
-    filtered_data = filtered_data.reset_index(drop=True)
-    filtered_records = filtered_data.drop('monthly_counts', axis=1).to_dict('records')
-    
-    # 尝试在筛选后的数据中找到之前选中的行
-    selected_index = 0
-    if current_selected_row:
-        for i, row in enumerate(filtered_records):
-            if (row['device_name'] == current_selected_row['device_name'] and
-                row['phase_name'] == current_selected_row['phase_name'] and
-                row['fault_name'] == current_selected_row['fault_name'] and
-                row['fault_start_time'] == current_selected_row['fault_start_time']):
-                selected_index = i
-                break
-    
-    return filtered_records, [selected_index]
+    return filtered_data
 
-# 修改图表和预警信息的回调函数
-@app.callback(
-    [Output('monthly-chart', 'figure'),
-     Output('warning-table', 'data')],
-    [Input('fault-table', 'selected_rows'),
-     Input('fault-table', 'data')]
-)
-def update_displays(selected_rows, current_table_data):
-    if not selected_rows:
-        selected_rows = [0]
-    
-    # 将当前表格数据转换回 DataFrame
-    current_df = pd.DataFrame(current_table_data)
-    
-    # 获取选中行的数据
-    selected_row = current_df.iloc[selected_rows[0]]
-    
-    # 使用多个条件匹配确保找到正确的行
-    mask = (processed_data['device_name'] == selected_row['device_name']) & \
-           (processed_data['phase_name'] == selected_row['phase_name']) & \
-           (processed_data['fault_name'] == selected_row['fault_name']) & \
-           (processed_data['fault_start_time'] == pd.to_datetime(selected_row['fault_start_time']))
-    
-    selected_row_data = processed_data[mask].iloc[0]
-    selected_index = processed_data[mask].index[0]
+# 根据表格行的关键信息定位 processed_data 中的索引
+def find_processed_index(processed_data, row):
+    mask = (processed_data['device_name'] == row['device_name']) & \
+           (processed_data['phase_name'] == row['phase_name']) & \
+           (processed_data['fault_name'] == row['fault_name']) & \
+           (processed_data['fault_start_time'] == pd.to_datetime(row['fault_start_time']))
+    matched = processed_data.index[mask]
+    return matched[0] if len(matched) else None
+
+# 生成选中故障的日历热力图
+def build_displays(snap, selected_index):
+    selected_row_data = snap['processed_data'].loc[selected_index]
+    global_max_warning_count = snap['global_max_warning_count']
     
     # 获取对应的预警数据
-    warning_df = warnings[selected_index]
-    
-    # 获取所有记录中预警次数的全局最大值
-    global_max_warning_count = max(
-        df.groupby(df['start_time'].dt.date).size().max()
-        for df in warnings
-        if not df.empty
-    )
+    warning_df = snap['warnings'][selected_index]
     
     # 创建整数刻度的颜色条标签
     colorbar_ticks = list(range(0, global_max_warning_count + 1))
@@ -643,11 +817,136 @@ def update_displays(selected_rows, current_table_data):
         showlegend=False,
     )
     
-    # 获取预警信息表格数据
-    warning_data = warning_df[['start_time', 'end_time', 'alarm_info']].to_dict('records')
+    return fig
+
+# 从预警数据中取出指定页的记录，只序列化当前页
+def get_warning_page(warnings, selected_index, page_current):
+    warning_df = warnings[selected_index]
+    start = (page_current or 0) * WARNING_PAGE_SIZE
+    page_df = warning_df.iloc[start:start + WARNING_PAGE_SIZE]
+    return page_df[['start_time', 'end_time', 'alarm_info']].to_dict('records')
+
+# 生成选中故障的展示输出：图表、预警总数、预警表格第一页、选中故障信息
+# 预警表格已在第一页时直接返回第一页数据；否则只把页码重置为 0，由翻页回调返回第一页
+def build_fault_outputs(snap, selected_index, page_current):
+    warning_total = len(snap['warnings'][selected_index])
+    page_count = max(1, -(-warning_total // WARNING_PAGE_SIZE))
+    selected_row = snap['processed_data'].loc[selected_index]
+    # 记录快照版本和故障关键信息，数据刷新后翻页时可在新快照中重新定位
+    selected_fault = {
+        'version': snap['version'],
+        'index': int(selected_index),
+        'key': {
+            'device_name': selected_row['device_name'],
+            'phase_name': selected_row['phase_name'],
+            'fault_name': selected_row['fault_name'],
+            'fault_start_time': str(selected_row['fault_start_time']),
+        },
+    }
+    return (
+        build_displays(snap, selected_index),
+        f'共 {warning_total} 条预警',
+        no_update if page_current else get_warning_page(snap['warnings'], selected_index, 0),
+        0 if page_current else no_update,
+        page_count,
+        selected_fault,
+    )
+
+# 筛选与展示合并为一个回调：
+# 只有点击“应用筛选”/“重置筛选”或选中表格行时才请求服务端，每次操作只有一次往返
+@app.callback(
+    [Output('fault-table', 'data'),
+     Output('fault-table', 'selected_rows'),
+     Output('monthly-chart', 'figure'),
+     Output('warning-total', 'children'),
+     Output('warning-table', 'data'),
+     Output('warning-table', 'page_current'),
+     Output('warning-table', 'page_count'),
+     Output('selected-fault', 'data')],
+    [Input('apply-filters', 'n_clicks'),
+     Input('reset-filters', 'n_clicks'),
+     Input('fault-table', 'selected_rows')],
+    [State('phase-filter', 'value'),
+     State('device-filter', 'value'),
+     State('fault-filter', 'value'),
+     State('date-diff-filter', 'value'),
+     State('warning-count-filter', 'value'),
+     State('date-range-filter', 'start_date'),
+     State('date-range-filter', 'end_date'),
+     State('fault-table', 'data'),
+     State('warning-table', 'page_current')]
+)
+def update_table_and_displays(apply_clicks, reset_clicks, selected_rows,
+                              phases, devices, faults, date_diff_range,
+                              warning_days_range, start_date, end_date,
+                              current_data, page_current):
+    # 整个回调只使用同一个快照，避免处理过程中数据被后台刷新替换
+    snap = snapshot
+    processed_data = snap['processed_data']
+    ctx = callback_context
+    trigger_id = ctx.triggered[0]['prop_id'].split('.')[0] if ctx.triggered else None
+    no_updates = (no_update,) * 8
+    
+    # 仅切换选中行：表格数据不变，只更新下方展示区域
+    if trigger_id == 'fault-table':
+        if not selected_rows or not current_data or selected_rows[0] >= len(current_data):
+            return no_updates
+        selected_index = find_processed_index(processed_data, current_data[selected_rows[0]])
+        if selected_index is None:
+            return no_updates
+        return (no_update, no_update) + build_fault_outputs(snap, selected_index, page_current)
+    
+    # 初始加载或重置按钮，返回原始数据
+    if trigger_id in (None, 'reset-filters'):
+        filtered_data = processed_data
+    else:
+        filtered_data = filter_processed_data(
+            processed_data, phases, devices, faults, date_diff_range,
+            warning_days_range, start_date, end_date
+        )
+    
+    # 尝试在筛选后的数据中找到之前选中的行
+    current_selected_index = None
+    if selected_rows and current_data and selected_rows[0] < len(current_data):
+        current_selected_index = find_processed_index(processed_data, current_data[selected_rows[0]])
+    
+    selected_position = 0
+    if current_selected_index is not None and current_selected_index in filtered_data.index:
+        selected_position = filtered_data.index.get_loc(current_selected_index)
+    
+    filtered_records = filtered_data.drop('monthly_counts', axis=1).to_dict('records')
+    
+    if filtered_data.empty:
+        return (filtered_records, [], go.Figure(), '共 0 条预警', [],
+                0 if page_current else no_update, 1, None)
     
-    return fig, warning_data
+    return (filtered_records, [selected_position]) + \
+        build_fault_outputs(snap, filtered_data.index[selected_position], page_current)
+
+# 预警表格翻页：只发送页码和选中故障信息，只返回当前页的预警记录
+@app.callback(
+    Output('warning-table', 'data', allow_duplicate=True),
+    [Input('warning-table', 'page_current')],
+    [State('selected-fault', 'data')],
+    prevent_initial_call=True
+)
+def update_warning_page(page_current, selected_fault):
+    if not selected_fault:
+        return no_update
+    snap = snapshot
+    selected_index = selected_fault['index']
+    # 数据已刷新时按故障关键信息在新快照中重新定位
+    if selected_fault['version'] != snap['version']:
+        selected_index = find_processed_index(snap['processed_data'], selected_fault['key'])
+        if selected_index is None:
+            return no_update
+    return get_warning_page(snap['warnings'], selected_index, page_current)
+
+# 启动后台刷新：作为模块被 WSGI 服务器导入时直接启动；
+# debug 模式下 Werkzeug 重载器的父进程不处理请求，只在子进程中启动
+if __name__ != '__main__' or not DEBUG or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+    start_refresh_worker()
 
 # 运行应用
 if __name__ == '__main__':
-    app.run_server(debug=True) 
\ No newline at end of file
+    app.run_server(debug=DEBUG) 
\ No newline at end of file
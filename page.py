@@ -15,19 +15,61 @@ def read_dim_data():
     return pd.read_csv(ROOT_PATH+'sz185_my_gen_fault_vis_dim.csv')
 
 
+# 读取单个预警文件
+def read_warning_file(file):
+    alarm_data = pd.read_csv(ROOT_PATH+'所有预警/'+file)
+    alarm_data = alarm_data[['device_name','device_id','phase_name','phase_id','start_time','end_time','alarm_info']]
+    alarm_data['start_time'] = pd.to_datetime(alarm_data['start_time'])
+    alarm_data['scene'] = file
+    return alarm_data
+
+
 # 读取预警表数据（根据文件名前缀动态读取）
 def read_warning_data():
     files = [f for f in os.listdir(ROOT_PATH+'所有预警/')]
-    dfs = []
-    for file in files:
-        alarm_data = pd.read_csv(ROOT_PATH+'所有预警/'+file)
-        alarm_data = alarm_data[['device_name','device_id','phase_name','phase_id','start_time','end_time','alarm_info']]
-        alarm_data['start_time'] = pd.to_datetime(alarm_data['start_time'])
-        alarm_data['scene'] = file
-        dfs.append(alarm_data)
+    dfs = [read_warning_file(file) for file in files]
     return pd.concat(dfs) if dfs else pd.DataFrame()
 
 
+# 按文件修改时间更新预警文件缓存 {文件名: (修改时间, 数据)}，只重新读取有变化的文件
+# 返回新增、修改、删除的文件中涉及的设备 id
+def refresh_warning_cache(file_cache):
+    files = [f for f in os.listdir(ROOT_PATH+'所有预警/')]
+    changed_devices = set()
+    for file in files:
+        mtime = os.path.getmtime(ROOT_PATH+'所有预警/'+file)
+        cached = file_cache.get(file)
+        if cached is not None and cached[0] == mtime:
+            continue
+        alarm_data = read_warning_file(file)
+        if cached is not None:
+            changed_devices.update(cached[1]['device_id'])
+        changed_devices.update(alarm_data['device_id'])
+        file_cache[file] = (mtime, alarm_data)
+    for file in set(file_cache) - set(files):
+        changed_devices.update(file_cache.pop(file)[1]['device_id'])
+    return changed_devices
+
+
+# 获取数据目录中所有数据文件的修改时间，用于检测数据更新
+# base 为故障表和维度表，warnings 为各预警文件
+def get_data_mtimes():
+    def collect(paths):
+        mtimes = {}
+        for path in paths:
+            try:
+                mtimes[path] = os.path.getmtime(path)
+            except OSError:
+                # 文件在扫描过程中被删除或替换，下次轮询再处理
+                continue
+        return mtimes
+
+    return {
+        'base': collect([ROOT_PATH+'sz185_故障.csv', ROOT_PATH+'sz185_my_gen_fault_vis_dim.csv']),
+        'warnings': collect([ROOT_PATH+'所有预警/'+f for f in os.listdir(ROOT_PATH+'所有预警/')]),
+    }
+
+
 # 根据故障开始时间筛选对应预警表中的数据，并计算相关统计信息
 def process_data_for_fault(fault_data, warning_data, dim_data):
     warning_data['start_time'] = pd.to_datetime(warning_data['start_time'])
@@ -78,3 +120,38 @@ def process_data_for_fault(fault_data, warning_data, dim_data):
     
     return pd.DataFrame(results), warnings
 
+
+
+# 构建筛选项索引：风场 -> 设备 -> 故障类型 -> 故障条数，数据加载时只计算一次
+def build_facet_index(processed_data):
+    facet_counts = processed_data.groupby(['phase_name', 'device_name', 'fault_name']).size()
+    facet_index = {}
+    for (phase, device, fault), count in facet_counts.items():
+        facet_index.setdefault(str(phase), {}).setdefault(str(device), {})[str(fault)] = int(count)
+    return facet_index
+
+
+# 根据其余两个筛选项的已选值，从索引中计算每个筛选项的可选值及对应故障条数
+def query_facet_counts(facet_index, phases=None, devices=None, faults=None):
+    def to_set(selected):
+        return set(selected) if selected and 'ALL' not in selected else None
+
+    phase_set, device_set, fault_set = to_set(phases), to_set(devices), to_set(faults)
+    phase_counts, device_counts, fault_counts = {}, {}, {}
+
+    for phase, device_dict in facet_index.items():
+        in_phase = phase_set is None or phase in phase_set
+        for device, fault_dict in device_dict.items():
+            in_device = device_set is None or device in device_set
+            if not (in_phase or in_device):
+                continue
+            for fault, count in fault_dict.items():
+                in_fault = fault_set is None or fault in fault_set
+                if in_device and in_fault:
+                    phase_counts[phase] = phase_counts.get(phase, 0) + count
+                if in_phase and in_fault:
+                    device_counts[device] = device_counts.get(device, 0) + count
+                if in_phase and in_device:
+                    fault_counts[fault] = fault_counts.get(fault, 0) + count
+
+    return phase_counts, device_counts, fault_counts